@@ -1,8 +1,10 @@
 import json
 import asyncio
 import subprocess
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List, Union
 import shlex
+import shutil
+import logging
 
 from .exceptions import (
     LumeError,
@@ -13,81 +15,167 @@ from .exceptions import (
     LumeConfigError,
 )
 
+# Request body: a JSON-serializable dict, or a pre-encoded JSON string
+JSONBody = Union[Dict[str, Any], str]
+
+# Seconds allowed to establish the connection, separate from the overall request timeout
+_CONNECT_TIMEOUT = 5.0
+
 class LumeClient:
-    def __init__(self, base_url: str, timeout: float = 60.0, debug: bool = False):
+    # Exception class and message template for HTTP statuses with a dedicated error
+    _STATUS_ERRORS = {
+        404: (LumeNotFoundError, "Resource not found: {path}"),
+        400: (LumeConfigError, "Invalid request: {body}"),
+    }
+    # Exception class and message template for curl exit codes with a dedicated error;
+    # any other non-zero exit is reported as a connection failure. Exit 28 covers both
+    # the connect timeout and the request timeout, so curl's message says which it was.
+    _CURL_ERRORS = {
+        28: (LumeTimeoutError, "Request timed out: {stderr}"),
+    }
+    # Header sent with requests that carry a JSON body
+    _JSON_BODY_ARGS = ("-H", "Content-Type: application/json")
+
+    def __init__(self, base_url: str, timeout: float = 60.0, debug: bool = False, max_connections: int = 100):
+        """Initialize the client.
+
+        Args:
+            base_url: Base URL of the lume API
+            timeout: Default request timeout in seconds
+            debug: Enable debug logging
+            max_connections: Maximum number of requests (curl processes) in flight at once.
+                           Very high values can exhaust ephemeral ports via TIME_WAIT sockets.
+        """
         self.base_url = base_url
         self.timeout = timeout
         self.debug = debug
+        self.max_connections = max_connections
+        self._request_slots = asyncio.Semaphore(max_connections)
+        # Tracks in-flight requests so close() can wait for them to finish
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Resolve curl once so each request execs it directly instead of searching PATH
+        self._curl_path = shutil.which("curl") or "curl"
+        # Arguments shared by every request, including the default headers;
+        # -S keeps curl's error message on stderr despite -s
+        self._curl_base_args = [
+            self._curl_path, "-sS", "-w", "%{http_code}",
+            "--connect-timeout", str(_CONNECT_TIMEOUT),
+            "-H", "Accept: application/json",
+        ]
+
+        # Configure logging
+        self.logger = logging.getLogger('lume_client')
+        if not self.logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
     def _log_debug(self, message: str, **kwargs) -> None:
         """Log debug information if debug mode is enabled."""
         if self.debug:
-            print(f"DEBUG: {message}")
+            self.logger.debug("%s", message)
             if kwargs:
-                print(json.dumps(kwargs, indent=2))
+                self.logger.debug("%s", kwargs)
 
-    async def _run_curl(self, method: str, path: str, data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None) -> Any:
-        """Execute a curl command and return the response."""
+    def _build_curl_cmd(self, method: str, path: str, data: Optional[JSONBody] = None, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> List[str]:
+        """Build the curl argument list for a request.
+
+        data may be a dict, or a string that is already encoded JSON and is sent as-is.
+        """
+        if timeout is None:
+            timeout = self.timeout
         url = f"{self.base_url}{path}"
         if params:
             param_str = "&".join(f"{k}={v}" for k, v in params.items())
             url = f"{url}?{param_str}"
 
-        cmd = ["curl", "-X", method, "-s", "-w", "%{http_code}", "-m", str(self.timeout)]
+        cmd = [*self._curl_base_args, "-X", method, "-m", str(timeout)]
         
         if data is not None:
-            cmd.extend(["-H", "Content-Type: application/json", "-d", json.dumps(data)])
+            cmd.extend(self._JSON_BODY_ARGS)
+            body = data if isinstance(data, str) else json.dumps(data, separators=(",", ":"))
+            cmd.extend(["-d", body])
         
         cmd.append(url)
+        return cmd
+
+    def _raise_for_status(self, status_code: int, response_body: str, path: str) -> None:
+        """Raise the exception matching an HTTP error status."""
+        mapped = self._STATUS_ERRORS.get(status_code)
+        if mapped is not None:
+            error_cls, template = mapped
+            raise error_cls(template.format(path=path, body=response_body))
+        if status_code >= 500:
+            raise LumeServerError(
+                f"Server error: {response_body}",
+                status_code=status_code,
+                response_text=response_body
+            )
+        raise LumeError(f"Request failed with status {status_code}: {response_body}")
+
+    async def _run_curl(self, method: str, path: str, data: Optional[JSONBody] = None, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None, raw: bool = False) -> Any:
+        """Execute a curl command and return the response (the undecoded body if raw is True)."""
+        if timeout is None:
+            timeout = self.timeout
+        cmd = self._build_curl_cmd(method, path, data=data, params=params, timeout=timeout)
         
-        self._log_debug(f"Running curl command: {' '.join(map(shlex.quote, cmd))}")
+        if self.debug:
+            self._log_debug(f"Running curl command: {' '.join(map(shlex.quote, cmd))}")
         
+        self._in_flight += 1
+        self._idle.clear()
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
+            async with self._request_slots:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
+                stdout, stderr = await process.communicate()
             
             if process.returncode != 0:
-                raise LumeConnectionError(f"Curl command failed: {stderr.decode()}")
+                error_cls, template = self._CURL_ERRORS.get(
+                    process.returncode, (LumeConnectionError, "Curl command failed: {stderr}")
+                )
+                raise error_cls(template.format(timeout=timeout, stderr=stderr.decode().strip()))
             
-            # The last 3 characters are the status code
-            response = stdout.decode()
-            status_code = int(response[-3:])
-            response_body = response[:-3]  # Remove status code from response
+            # The last 3 bytes are the status code; the body is parsed as bytes
+            # and only decoded when it is needed for an error message
+            status_code = int(stdout[-3:])
+            response_body = stdout[:-3]
             
             if status_code >= 400:
-                if status_code == 404:
-                    raise LumeNotFoundError(f"Resource not found: {path}")
-                elif status_code == 400:
-                    raise LumeConfigError(f"Invalid request: {response_body}")
-                elif status_code >= 500:
-                    raise LumeServerError(f"Server error: {response_body}")
-                else:
-                    raise LumeError(f"Request failed with status {status_code}: {response_body}")
+                self._raise_for_status(status_code, response_body.decode(), path)
             
-            return json.loads(response_body) if response_body.strip() else None
+            if raw:
+                return response_body
+            # Empty replies (204, or a 200 without a body) carry nothing to decode
+            if status_code == 204 or not response_body or response_body.isspace():
+                return None
+            return json.loads(response_body)
             
-        except asyncio.TimeoutError:
-            raise LumeTimeoutError(f"Request timed out after {self.timeout} seconds")
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.set()
 
-    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
         """Make a GET request."""
-        return await self._run_curl("GET", path, params=params)
+        return await self._run_curl("GET", path, params=params, timeout=timeout)
+
+    async def get_raw(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> bytes:
+        """Make a GET request and return the raw JSON response body."""
+        return await self._run_curl("GET", path, params=params, timeout=timeout, raw=True)
 
-    async def post(self, path: str, data: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+    async def post(self, path: str, data: Optional[JSONBody] = None, timeout: Optional[float] = None) -> Any:
         """Make a POST request."""
-        old_timeout = self.timeout
-        if timeout is not None:
-            self.timeout = timeout
-        try:
-            return await self._run_curl("POST", path, data=data)
-        finally:
-            self.timeout = old_timeout
+        return await self._run_curl("POST", path, data=data, timeout=timeout)
 
-    async def patch(self, path: str, data: Dict[str, Any]) -> None:
+    async def patch(self, path: str, data: JSONBody) -> None:
         """Make a PATCH request."""
         await self._run_curl("PATCH", path, data=data)
 
@@ -95,18 +183,20 @@ class LumeClient:
         """Make a DELETE request."""
         await self._run_curl("DELETE", path)
 
-    def print_curl(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> None:
+    def print_curl(self, method: str, path: str, data: Optional[JSONBody] = None) -> None:
         """Print equivalent curl command for debugging."""
-        curl_cmd = f"""curl -X {method} \\
-  '{self.base_url}{path}'"""
-        
-        if data:
-            curl_cmd += f" \\\n  -H 'Content-Type: application/json' \\\n  -d '{json.dumps(data)}'"
+        if not self.debug:
+            return
+        cmd = self._build_curl_cmd(method, path, data=data)
         
         print("\nEquivalent curl command:")
-        print(curl_cmd)
+        print(' '.join(map(shlex.quote, cmd)))
         print()
 
+    async def drain(self) -> None:
+        """Wait until no requests are in flight."""
+        await self._idle.wait()
+
     async def close(self) -> None:
         """Close the client resources."""
         pass  # No shared resources to clean up
\ No newline at end of file
@@ -26,8 +26,13 @@ class LumeConfigError(LumeError):
     pass
 
 class LumeVMError(LumeError):
-    """Raised when there's an error with a VM operation."""
-    pass
+    """Raised when there's an error with a VM operation.
+
+    For bulk operations, errors maps each failed VM name to the exception it raised.
+    """
+    def __init__(self, message: str, errors: dict = None):
+        self.errors = errors or {}
+        super().__init__(message)
 
 class LumeImageError(LumeError):
     """Raised when there's an error with an image operation."""
@@ -1,11 +1,16 @@
-from typing import Optional, List, Literal, Dict, Any
-import re
-from pydantic import BaseModel, Field, computed_field, validator, ConfigDict, RootModel
+from typing import Optional, List, Literal, Dict, Any, Annotated
+from pydantic import BaseModel, Field, computed_field, ConfigDict, RootModel, StringConstraints
+
+# Memory and disk sizes with units, e.g. "4GB" or "512MB". The pattern is
+# compiled once by pydantic-core and checked there on validation.
+SizeStr = Annotated[str, StringConstraints(pattern=r"(?i)^\d+(KB|MB|GB|TB)$")]
 
 class DiskInfo(BaseModel):
     total: int
     allocated: int
 
+    model_config = ConfigDict(frozen=True)
+
 class VMConfig(BaseModel):
     """Configuration for creating a new VM.
     
@@ -14,8 +19,8 @@ class VMConfig(BaseModel):
     name: str
     os: Literal["macOS", "linux"] = "macOS"
     cpu: int = Field(default=2, ge=1)
-    memory: str = "4GB"
-    disk_size: str = Field(default="64GB", alias="diskSize")
+    memory: SizeStr = "4GB"
+    disk_size: SizeStr = Field(default="64GB", alias="diskSize")
     display: str = "1024x768"
     ipsw: Optional[str] = Field(default=None, description="IPSW path or 'latest', for macOS VMs")
 
@@ -25,11 +30,9 @@ class VMConfig(BaseModel):
 class SharedDirectory(BaseModel):
     """Configuration for a shared directory."""
     host_path: str = Field(..., alias="hostPath")  # Allow host_path but serialize as hostPath
-    read_only: bool = False
-    
-    class Config:
-        populate_by_name = True  # Allow both alias and original name
-        alias_generator = lambda s: ''.join(word.capitalize() if i else word for i, word in enumerate(s.split('_')))
+    read_only: bool = Field(default=False, alias="readOnly")
+
+    model_config = ConfigDict(populate_by_name=True)  # Allow both alias and original name
 
 class VMRunOpts(BaseModel):
     """Configuration for running a VM.
@@ -49,21 +52,6 @@ class VMRunOpts(BaseModel):
         alias_generator=lambda s: ''.join(word.capitalize() if i else word for i, word in enumerate(s.split('_')))
     )
 
-    def model_dump(self, **kwargs):
-        data = super().model_dump(**kwargs)
-        # Convert shared directory fields to match API expectations
-        if self.shared_directories and "by_alias" in kwargs and kwargs["by_alias"]:
-            data["sharedDirectories"] = [
-                {
-                    "hostPath": d.host_path,
-                    "readOnly": d.read_only
-                }
-                for d in self.shared_directories
-            ]
-            # Remove the snake_case version if it exists
-            data.pop("shared_directories", None)
-        return data
-
 class VMStatus(BaseModel):
     name: str
     status: str
@@ -74,8 +62,8 @@ class VMStatus(BaseModel):
     vnc_url: Optional[str] = Field(default=None, alias="vncUrl")
     ip_address: Optional[str] = Field(default=None, alias="ipAddress")
 
-    class Config:
-        populate_by_alias = True
+    # Read-only API response
+    model_config = ConfigDict(frozen=True)
 
     @computed_field
     @property
@@ -90,14 +78,13 @@ class VMStatus(BaseModel):
     @computed_field
     @property
     def memory(self) -> str:
-        # Convert bytes to GB
-        gb = self.memory_size / (1024 * 1024 * 1024)
-        return f"{int(gb)}GB"
+        # Convert bytes to whole GB
+        return f"{self.memory_size >> 30}GB"
 
 class VMUpdateOpts(BaseModel):
     cpu: Optional[int] = None
-    memory: Optional[str] = None
-    disk_size: Optional[str] = None
+    memory: Optional[SizeStr] = None
+    disk_size: Optional[SizeStr] = None
 
 class ImageRef(BaseModel):
     """Reference to a VM image."""
@@ -122,10 +109,14 @@ class ImageInfo(BaseModel):
     """Model for individual image information."""
     imageId: str
 
+    model_config = ConfigDict(frozen=True)
+
 class ImageList(RootModel):
     """Response model for the images endpoint."""
     root: List[ImageInfo]
 
+    model_config = ConfigDict(frozen=True)
+
     def __iter__(self):
         return iter(self.root)
 
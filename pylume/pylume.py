@@ -1,13 +1,12 @@
 import os
 import sys
-import json
 import time
 import asyncio
-import subprocess
-from typing import Optional, List, Union, Callable, TypeVar, Any
-from functools import wraps
+from typing import Optional, List, Union, Callable, TypeVar, Any, Tuple
+from functools import wraps, lru_cache
 import re
 import signal
+from pydantic import TypeAdapter
 
 from .server import LumeServer
 from .client import LumeClient
@@ -35,21 +34,81 @@ from .exceptions import (
 # Type variable for the decorator
 T = TypeVar('T')
 
+# Parses and validates a JSON array of VMs in a single pydantic-core pass
+_VM_LIST_ADAPTER = TypeAdapter(List[VMStatus])
+
+# Payload for run_vm when no options are given, serialized once
+_DEFAULT_RUN_PAYLOAD = VMRunOpts(no_display=False).model_dump_json(by_alias=True, exclude_none=True)
+
+# Seconds a successful server check is trusted before checking again
+_SERVER_CHECK_TTL = 1.0
+
+# Default, image-pull and read-only query request timeouts, in seconds
+_DEFAULT_TIMEOUT = 300.0
+_PULL_TIMEOUT = 300.0
+_QUERY_TIMEOUT = 30.0
+
+# Seconds close() waits for in-flight requests before stopping the server
+_DRAIN_TIMEOUT = 2.0
+
+@lru_cache(maxsize=256)
+def _image_from_str(spec: str) -> Tuple[str, str, str]:
+    """Resolve an "image[:tag]" string against the default registry and organization."""
+    image_str = spec if ":" in spec else f"{spec}:latest"
+    return image_str, "ghcr.io", "trycua"
+
+@lru_cache(maxsize=128)
+def _clone_payload(name: str, new_name: str) -> str:
+    """Encode the clone request body, reused when the same VM is cloned repeatedly."""
+    return CloneSpec(name=name, newName=new_name).model_dump_json(by_alias=True)
+
+def _normalize_image_spec(spec: Union[ImageRef, dict, str]) -> Tuple[str, str, str]:
+    """Return (image:tag, registry, organization) for any accepted image spec."""
+    if isinstance(spec, str):
+        return _image_from_str(spec)
+    if isinstance(spec, dict):
+        return (
+            f"{spec.get('image', '')}:{spec.get('tag', 'latest')}",
+            spec.get("registry", "ghcr.io"),
+            spec.get("organization", "trycua"),
+        )
+    return f"{spec.image}:{spec.tag}", spec.registry, spec.organization
+
 def ensure_server(func: Callable[..., T]) -> Callable[..., T]:
-    """Decorator to ensure server is running before executing the method."""
+    """Decorator to ensure server is running and the client is initialized before executing the method.
+
+    A successful check is cached for _SERVER_CHECK_TTL seconds so bursts of calls
+    skip it; connection failures and timeouts invalidate the cache and make the next
+    check probe the server for responsiveness.
+    """
     @wraps(func)
     async def wrapper(self: 'PyLume', *args: Any, **kwargs: Any) -> T:
-        await self.server.ensure_running()
-        return await func(self, *args, **kwargs)
+        if time.monotonic() >= self._server_ok_until:
+            await self._ensure_running()
+        await self._init_client()
+        try:
+            return await func(self, *args, **kwargs)
+        except (LumeConnectionError, LumeTimeoutError):
+            self._server_ok_until = 0.0
+            self._needs_verify = True
+            raise
     return wrapper
 
 class PyLume:
+    __slots__ = (
+        "server", "max_connections", "eager_tasks", "client",
+        "_server_ok_until", "_needs_verify", "_ensure_task",
+        "_eager_loop", "_saved_task_factory",
+    )
+
     def __init__(
         self,
         debug: bool = False,
         server_start_timeout: int = 60,
         port: Optional[int] = None,
-        use_existing_server: bool = False
+        use_existing_server: bool = False,
+        max_connections: int = 100,
+        eager_tasks: bool = False
     ):
         """Initialize the async PyLume client.
         
@@ -60,6 +119,11 @@ class PyLume:
             port: Port number for the lume server. Required when use_existing_server is True.
             use_existing_server: If True, will try to connect to an existing server on the specified port
                                instead of starting a new one.
+            max_connections: Maximum number of concurrent requests to the lume server.
+            eager_tasks: If True, install asyncio.eager_task_factory (Python 3.12+) on the running
+                        loop in start() (and so when entering the context manager), so fanned-out
+                        requests start without an extra scheduler hop. This affects every task on
+                        that loop until close() restores the previous factory.
         """
         if use_existing_server and port is None:
             raise LumeConfigError("Port must be specified when using an existing server")
@@ -70,25 +134,50 @@ class PyLume:
             port=port,
             use_existing_server=use_existing_server
         )
+        self.max_connections = max_connections
+        self.eager_tasks = eager_tasks
         self.client = None
+        self._server_ok_until = 0.0
+        # Set after a connection failure or timeout so the next check probes the server
+        self._needs_verify = False
+        self._ensure_task: Optional[asyncio.Task] = None
+        # Loop we installed the eager task factory on, and the factory it replaced
+        self._eager_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._saved_task_factory = None
 
     async def __aenter__(self) -> 'PyLume':
         """Async context manager entry."""
-        if self.server.use_existing_server:
-            # Just set up the base URL and initialize client for existing server
-            self.server.port = self.server.requested_port
-            self.server.base_url = f"http://localhost:{self.server.port}/lume"
-        else:
-            await self.server.ensure_running()
-        
-        await self._init_client()
+        await self.start()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         """Async context manager exit."""
-        if self.client is not None:
-            await self.client.close()
-        await self.server.stop()
+        await self.close()
+
+    async def start(self) -> None:
+        """Start (or connect to) the server and initialize the client.
+
+        Called by the async context manager. Without it, the first API call does this lazily.
+        """
+        if self.eager_tasks and self._eager_loop is None and hasattr(asyncio, "eager_task_factory"):
+            loop = asyncio.get_running_loop()
+            self._saved_task_factory = loop.get_task_factory()
+            loop.set_task_factory(asyncio.eager_task_factory)
+            self._eager_loop = loop
+        await self._ensure_running()
+        await self._init_client()
+
+    async def _ensure_running(self) -> None:
+        """Make sure the server is running, sharing one check between concurrent callers."""
+        task = self._ensure_task
+        if task is None or task.done():
+            task = self._ensure_task = asyncio.create_task(
+                self.server.ensure_running(verify=self._needs_verify)
+            )
+        # Shield the shared task so a cancelled caller doesn't cancel it for the others
+        await asyncio.shield(task)
+        self._needs_verify = False
+        self._server_ok_until = time.monotonic() + _SERVER_CHECK_TTL
 
     async def _init_client(self) -> None:
         """Initialize the client if not already initialized."""
@@ -97,121 +186,59 @@ class PyLume:
                 raise RuntimeError("Server base URL not set")
             self.client = LumeClient(
                 base_url=self.server.base_url,
-                timeout=300.0,
-                debug=self.server.debug
+                timeout=_DEFAULT_TIMEOUT,
+                debug=self.server.debug,
+                max_connections=self.max_connections
             )
 
     def _log_debug(self, message: str, **kwargs) -> None:
         """Log debug information if debug mode is enabled."""
         if self.server.debug:
-            print(f"DEBUG: {message}")
+            self.server.logger.debug("%s", message)
             if kwargs:
-                print(json.dumps(kwargs, indent=2))
-
-    async def _handle_api_error(self, e: Exception, operation: str) -> None:
-        """Handle API errors and raise appropriate custom exceptions."""
-        if isinstance(e, subprocess.SubprocessError):
-            raise LumeConnectionError(f"Failed to connect to PyLume server: {str(e)}")
-        elif isinstance(e, asyncio.TimeoutError):
-            raise LumeTimeoutError(f"Request timed out: {str(e)}")
-            
-        if not hasattr(e, 'status') and not isinstance(e, subprocess.CalledProcessError):
-            raise LumeServerError(f"Unknown error during {operation}: {str(e)}")
-            
-        status_code = getattr(e, 'status', 500)
-        response_text = str(e)
-        
-        self._log_debug(
-            f"{operation} request failed",
-            status_code=status_code,
-            response_text=response_text
-        )
-        
-        if status_code == 404:
-            raise LumeNotFoundError(f"Resource not found during {operation}")
-        elif status_code == 400:
-            raise LumeConfigError(f"Invalid configuration for {operation}: {response_text}")
-        elif status_code >= 500:
-            raise LumeServerError(
-                f"Server error during {operation}",
-                status_code=status_code,
-                response_text=response_text
-            )
-        else:
-            raise LumeServerError(
-                f"Error during {operation}",
-                status_code=status_code,
-                response_text=response_text
-            )
-
-    async def _read_output(self) -> None:
-        """Read and log server output."""
-        try:
-            while True:
-                if not self.server_process or self.server_process.poll() is not None:
-                    self._log_debug("Server process ended")
-                    break
-
-                # Read stdout without blocking
-                if self.server_process.stdout:
-                    while True:
-                        line = self.server_process.stdout.readline()
-                        if not line:
-                            break
-                        line = line.strip()
-                        self._log_debug(f"Server stdout: {line}")
-                        if "Server started" in line:
-                            self._log_debug("Detected server started message")
-                            return
-
-                # Read stderr without blocking
-                if self.server_process.stderr:
-                    while True:
-                        line = self.server_process.stderr.readline()
-                        if not line:
-                            break
-                        line = line.strip()
-                        self._log_debug(f"Server stderr: {line}")
-                        if "error" in line.lower():
-                            raise RuntimeError(f"Server error: {line}")
-
-                await asyncio.sleep(0.1)  # Small delay to prevent CPU spinning
-        except Exception as e:
-            self._log_debug(f"Error in output reader: {str(e)}")
-            raise
+                self.server.logger.debug("%s", kwargs)
 
     @ensure_server
     async def create_vm(self, spec: Union[VMConfig, dict]) -> None:
         """Create a new VM."""
         if isinstance(spec, VMConfig):
-            spec = spec.model_dump(by_alias=True, exclude_none=True)
+            spec = spec.model_dump_json(by_alias=True, exclude_none=True)
         
-        self.client.print_curl("POST", "/vms", spec)
         await self.client.post("/vms", spec)
 
     @ensure_server
     async def run_vm(self, name: str, opts: Optional[Union[VMRunOpts, dict]] = None) -> None:
         """Run a VM."""
         if opts is None:
-            opts = VMRunOpts(no_display=False)
-        elif isinstance(opts, dict):
-            opts = VMRunOpts(**opts)
-            
-        payload = opts.model_dump(by_alias=True, exclude_none=True)
-        self.client.print_curl("POST", f"/vms/{name}/run", payload)
+            payload = _DEFAULT_RUN_PAYLOAD
+        else:
+            if isinstance(opts, dict):
+                # Validation maps field names such as no_display to the API's aliases
+                opts = VMRunOpts(**opts)
+            payload = opts.model_dump_json(by_alias=True, exclude_none=True)
         await self.client.post(f"/vms/{name}/run", payload)
 
     @ensure_server
     async def list_vms(self) -> List[VMStatus]:
         """List all VMs."""
-        data = await self.client.get("/vms")
-        return [VMStatus.model_validate(vm) for vm in data]
+        data = await self.client.get_raw("/vms", timeout=_QUERY_TIMEOUT)
+        return _VM_LIST_ADAPTER.validate_json(data)
 
     @ensure_server
     async def get_vm(self, name: str) -> VMStatus:
         """Get VM details."""
-        data = await self.client.get(f"/vms/{name}")
-        return VMStatus.model_validate(data)
+        data = await self.client.get_raw(f"/vms/{name}", timeout=_QUERY_TIMEOUT)
+        return VMStatus.model_validate_json(data)
+
+    @ensure_server
+    async def bulk_get_vms(self, names: List[str]) -> List[VMStatus]:
+        """Get details for several VMs with a single list request."""
+        data = await self.client.get_raw("/vms", timeout=_QUERY_TIMEOUT)
+        vms = {vm.name: vm for vm in _VM_LIST_ADAPTER.validate_json(data)}
+        missing = [name for name in names if name not in vms]
+        if missing:
+            raise LumeNotFoundError(f"VMs not found: {', '.join(missing)}")
+        return [vms[name] for name in names]
 
     @ensure_server
     async def update_vm(self, name: str, params: Union[VMUpdateOpts, dict]) -> None:
@@ -219,8 +246,7 @@ class PyLume:
         if isinstance(params, dict):
             params = VMUpdateOpts(**params)
             
-        payload = params.model_dump(by_alias=True, exclude_none=True)
-        self.client.print_curl("PATCH", f"/vms/{name}", payload)
+        payload = params.model_dump_json(by_alias=True, exclude_none=True)
         await self.client.patch(f"/vms/{name}", payload)
 
     @ensure_server
@@ -233,27 +259,38 @@ class PyLume:
         """Delete a VM."""
         await self.client.delete(f"/vms/{name}")
 
+    async def bulk_stop_vms(self, names: List[str]) -> None:
+        """Stop several VMs concurrently.
+
+        Every stop runs to completion; if any fail, a LumeVMError is raised whose errors
+        attribute maps each failed name to its exception.
+        """
+        await self._run_for_vms("stop", self.stop_vm, names)
+
+    async def bulk_delete_vms(self, names: List[str]) -> None:
+        """Delete several VMs concurrently.
+
+        Every delete runs to completion; if any fail, a LumeVMError is raised whose errors
+        attribute maps each failed name to its exception.
+        """
+        await self._run_for_vms("delete", self.delete_vm, names)
+
+    async def _run_for_vms(self, action: str, func: Callable[[str], Any], names: List[str]) -> None:
+        """Run a per-VM operation for all names at once and report every failure together."""
+        results = await asyncio.gather(*(func(name) for name in names), return_exceptions=True)
+        # Cancellation and interpreter exits are not VM failures; let them propagate
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        failed = {name: result for name, result in zip(names, results) if isinstance(result, Exception)}
+        if failed:
+            details = ", ".join(f"{name} ({error})" for name, error in failed.items())
+            raise LumeVMError(f"Failed to {action} VMs: {details}", errors=failed) from next(iter(failed.values()))
+
     @ensure_server
     async def pull_image(self, spec: Union[ImageRef, dict, str], name: Optional[str] = None) -> None:
         """Pull a VM image."""
-        await self._init_client()
-        if isinstance(spec, str):
-            if ":" in spec:
-                image_str = spec
-            else:
-                image_str = f"{spec}:latest"
-            registry = "ghcr.io"
-            organization = "trycua"
-        elif isinstance(spec, dict):
-            image = spec.get("image", "")
-            tag = spec.get("tag", "latest")
-            image_str = f"{image}:{tag}"
-            registry = spec.get("registry", "ghcr.io")
-            organization = spec.get("organization", "trycua")
-        else:
-            image_str = f"{spec.image}:{spec.tag}"
-            registry = spec.registry
-            organization = spec.organization
+        image_str, registry, organization = _normalize_image_spec(spec)
             
         payload = {
             "image": image_str,
@@ -262,40 +299,50 @@ class PyLume:
             "organization": organization
         }
         
-        self.client.print_curl("POST", "/pull", payload)
-        await self.client.post("/pull", payload, timeout=300.0)
+        await self.client.post("/pull", payload, timeout=_PULL_TIMEOUT)
 
     @ensure_server
     async def clone_vm(self, name: str, new_name: str) -> None:
         """Clone a VM with the given name to a new VM with new_name."""
-        config = CloneSpec(name=name, newName=new_name)
-        self.client.print_curl("POST", "/vms/clone", config.model_dump())
-        await self.client.post("/vms/clone", config.model_dump())
+        await self.client.post("/vms/clone", _clone_payload(name, new_name))
 
     @ensure_server
     async def get_latest_ipsw_url(self) -> str:
         """Get the latest IPSW URL."""
-        await self._init_client()
         data = await self.client.get("/ipsw")
         return data["url"]
 
     @ensure_server
     async def get_images(self, organization: Optional[str] = None) -> ImageList:
         """Get list of available images."""
-        await self._init_client()
         params = {"organization": organization} if organization else None
-        data = await self.client.get("/images", params)
-        return ImageList(root=data)
+        data = await self.client.get_raw("/images", params, timeout=_QUERY_TIMEOUT)
+        return ImageList.model_validate_json(data)
 
     async def close(self) -> None:
         """Close the client and stop the server."""
-        if self.client is not None:
-            await self.client.close()
-            self.client = None
-        await asyncio.sleep(1)  # Reduced from 2 to 1 second
-        await self.server.stop()
-
-    async def _ensure_client(self) -> None:
-        """Ensure client is initialized."""
-        if self.client is None:
-            await self._init_client() 
\ No newline at end of file
+        try:
+            if self.client is not None:
+                try:
+                    await asyncio.wait_for(self.client.drain(), timeout=_DRAIN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    self._log_debug("Closing with requests still in flight")
+                await self.client.close()
+                self.client = None
+        finally:
+            self._server_ok_until = 0.0
+            self._needs_verify = False
+            try:
+                await self.server.stop()
+            finally:
+                self._restore_task_factory()
+
+    def _restore_task_factory(self) -> None:
+        """Put back the task factory start() replaced, unless it has been changed since."""
+        loop = self._eager_loop
+        if loop is None:
+            return
+        if not loop.is_closed() and loop.get_task_factory() is asyncio.eager_task_factory:
+            loop.set_task_factory(self._saved_task_factory)
+        self._eager_loop = None
+        self._saved_task_factory = None 
\ No newline at end of file
@@ -1,16 +1,43 @@
 import os
 import time
 import asyncio
-import subprocess
-import tempfile
 import logging
 import socket
 from typing import Optional
 import sys
 from .exceptions import LumeConnectionError
 import signal
+from collections import deque
+
+# Seconds allowed for a health probe, and for the server to exit once asked to stop
+_VERIFY_TIMEOUT = 10.0
+_STOP_TIMEOUT = 5.0
+
+# Seconds between attempts to connect to the server's port during startup
+_PORT_RETRY_INTERVAL = 0.05
+
+# First and maximum delay, in seconds, between health probes while waiting for startup
+_PROBE_BACKOFF_START = 0.025
+_PROBE_BACKOFF_MAX = 1.0
+
+# Seconds to wait for the remaining output of a server that exited during startup
+_OUTPUT_DRAIN_TIMEOUT = 1.0
+
+# Most recent server output lines kept for error reports
+_OUTPUT_LINES = 1000
+
+# Line the server prints once it is accepting requests, matched on raw output
+_READY_MARKER = b"Server started"
 
 class LumeServer:
+    __slots__ = (
+        "debug", "server_start_timeout", "server_process", "server_output",
+        "_output_task", "_server_started", "requested_port", "port", "base_url",
+        "_probe_request", "use_existing_server", "_lume_path", "logger",
+    )
+    # Set once the bundled binary has been found executable, so later servers skip the check
+    _lume_verified = False
+
     def __init__(
         self, 
         debug: bool = False, 
@@ -22,11 +49,18 @@ class LumeServer:
         self.debug = debug
         self.server_start_timeout = server_start_timeout
         self.server_process = None
-        self.output_file = None
+        self.server_output = deque(maxlen=_OUTPUT_LINES)
+        self._output_task = None
+        self._server_started = None
         self.requested_port = port
         self.port = None
         self.base_url = None
+        self._probe_request = None
         self.use_existing_server = use_existing_server
+        # Path to the lume executable in the same directory as this file
+        self._lume_path = os.path.join(os.path.dirname(__file__), "lume")
+        if not use_existing_server:
+            self._check_lume_binary()
         
         # Configure logging
         self.logger = logging.getLogger('lume_server')
@@ -37,41 +71,47 @@ class LumeServer:
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
+    def _check_lume_binary(self) -> None:
+        """Verify the lume binary exists, making it executable if needed."""
+        if LumeServer._lume_verified:
+            return
+        try:
+            lume_stat = os.stat(self._lume_path)
+        except FileNotFoundError:
+            raise RuntimeError(f"Could not find lume binary at {self._lume_path}")
+        # Only touch the mode when this user can't already execute it
+        if not os.access(self._lume_path, os.X_OK):
+            try:
+                os.chmod(self._lume_path, lume_stat.st_mode | 0o755)
+            except PermissionError:
+                raise RuntimeError(f"lume binary at {self._lume_path} is not executable and cannot be made so")
+        LumeServer._lume_verified = True
+
+    def _set_port(self, port: int) -> None:
+        """Point the server URL, and the health probe request, at a port."""
+        self.port = port
+        self.base_url = f"http://localhost:{port}/lume"
+        # Health probe request, built once per port
+        self._probe_request = (
+            f"GET /lume/vms HTTP/1.1\r\nHost: localhost:{port}\r\nConnection: close\r\n\r\n"
+        ).encode()
+
     def _check_port_available(self, port: int) -> bool:
         """Check if a specific port is available."""
         try:
-            # Create a socket
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.logger.debug(f"Created socket for port {port} check")
-            
-            # Set socket options
-            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.logger.debug("Set SO_REUSEADDR")
-            
-            # Bind to the port
-            try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 s.bind(('127.0.0.1', port))
-                self.logger.debug(f"Successfully bound to port {port}")
+                # With SO_REUSEADDR, BSD/macOS let a specific-address bind succeed next to
+                # a wildcard listener; listen() is what fails when the port is in use
                 s.listen(1)
-                self.logger.debug(f"Successfully listening on port {port}")
-                s.close()
-                self.logger.debug(f"Port {port} is available")
-                return True
-            except OSError as e:
-                self.logger.debug(f"Failed to bind to port {port}: {str(e)}")
-                return False
-            finally:
-                try:
-                    s.close()
-                    self.logger.debug("Socket closed")
-                except:
-                    pass
-                
-        except Exception as e:
-            self.logger.debug(f"Unexpected error checking port {port}: {str(e)}")
+        except OSError as e:
+            self.logger.debug(f"Failed to bind to port {port}: {str(e)}")
             return False
+        self.logger.debug(f"Port {port} is available")
+        return True
 
-    def _get_server_port(self) -> int:
+    async def _get_server_port(self) -> int:
         """Get and validate the server port."""
         from .exceptions import LumeConfigError
         
@@ -84,7 +124,7 @@ class LumeServer:
         for attempt in range(3):
             if attempt > 0:
                 self.logger.debug(f"Retrying port check (attempt {attempt + 1})")
-                time.sleep(1)
+                await asyncio.sleep(1)
             
             if self._check_port_available(self.requested_port):
                 self.logger.debug(f"Port {self.requested_port} is available")
@@ -94,202 +134,33 @@ class LumeServer:
         
         raise LumeConfigError(f"Requested port {self.requested_port} is not available after 3 attempts")
 
-    async def _ensure_server_running(self) -> None:
-        """Ensure the lume server is running, start it if it's not."""
-        try:
-            self.logger.debug("Checking if lume server is running...")
-            # Try to connect to the server with a short timeout
-            cmd = ["curl", "-s", "-w", "%{http_code}", "-m", "5", f"{self.base_url}/vms"]
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode == 0:
-                response = stdout.decode()
-                status_code = int(response[-3:])
-                if status_code == 200:
-                    self.logger.debug("PyLume server is running")
-                    return
-                
-            self.logger.debug("PyLume server not running, attempting to start it")
-            # Server not running, try to start it
-            lume_path = os.path.join(os.path.dirname(__file__), "lume")
-            if not os.path.exists(lume_path):
-                raise RuntimeError(f"Could not find lume binary at {lume_path}")
-            
-            # Make sure the file is executable
-            os.chmod(lume_path, 0o755)
-            
-            # Create a temporary file for server output
-            self.output_file = tempfile.NamedTemporaryFile(mode='w+', delete=False)
-            self.logger.debug(f"Using temporary file for server output: {self.output_file.name}")
-            
-            # Start the server
-            self.logger.debug(f"Starting lume server with: {lume_path} serve --port {self.port}")
-            
-            # Start server in background using subprocess.Popen
-            try:
-                self.server_process = subprocess.Popen(
-                    [lume_path, "serve", "--port", str(self.port)],
-                    stdout=self.output_file,
-                    stderr=self.output_file,
-                    cwd=os.path.dirname(lume_path),
-                    start_new_session=True  # Run in new session to avoid blocking
-                )
-            except Exception as e:
-                self.output_file.close()
-                os.unlink(self.output_file.name)
-                raise RuntimeError(f"Failed to start lume server process: {str(e)}")
-            
-            # Wait for server to start
-            self.logger.debug(f"Waiting up to {self.server_start_timeout} seconds for server to start...")
-            start_time = time.time()
-            server_ready = False
-            last_size = 0
-            
-            while time.time() - start_time < self.server_start_timeout:
-                if self.server_process.poll() is not None:
-                    # Process has terminated
-                    self.output_file.seek(0)
-                    output = self.output_file.read()
-                    self.output_file.close()
-                    os.unlink(self.output_file.name)
-                    error_msg = (
-                        f"Server process terminated unexpectedly.\n"
-                        f"Exit code: {self.server_process.returncode}\n"
-                        f"Output: {output}"
-                    )
-                    raise RuntimeError(error_msg)
-                
-                # Check output file for server ready message
-                self.output_file.seek(0, os.SEEK_END)
-                size = self.output_file.tell()
-                if size > last_size:  # Only read if there's new content
-                    self.output_file.seek(last_size)
-                    new_output = self.output_file.read()
-                    if new_output.strip():  # Only log non-empty output
-                        self.logger.debug(f"Server output: {new_output.strip()}")
-                    last_size = size
-                    
-                    if "Server started" in new_output:
-                        server_ready = True
-                        self.logger.debug("Server startup detected")
-                        break
-                
-                # Try to connect to the server periodically
-                try:
-                    cmd = ["curl", "-s", "-w", "%{http_code}", "-m", "5", f"{self.base_url}/vms"]
-                    process = await asyncio.create_subprocess_exec(
-                        *cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                    stdout, stderr = await process.communicate()
-                    
-                    if process.returncode == 0:
-                        response = stdout.decode()
-                        status_code = int(response[-3:])
-                        if status_code == 200:
-                            server_ready = True
-                            self.logger.debug("Server is responding to requests")
-                            break
-                except:
-                    pass  # Server not ready yet
-                
-                await asyncio.sleep(1.0)
-            
-            if not server_ready:
-                # Cleanup if server didn't start
-                if self.server_process:
-                    self.server_process.terminate()
-                    try:
-                        self.server_process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        self.server_process.kill()
-                self.output_file.close()
-                os.unlink(self.output_file.name)
-                raise RuntimeError(
-                    f"Failed to start lume server after {self.server_start_timeout} seconds. "
-                    "Check the debug output for more details."
-                )
-            
-            # Give the server a moment to fully initialize
-            await asyncio.sleep(2.0)
-            
-            # Verify server is responding
-            try:
-                cmd = ["curl", "-s", "-w", "%{http_code}", "-m", "10", f"{self.base_url}/vms"]
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                stdout, stderr = await process.communicate()
-                
-                if process.returncode != 0:
-                    raise RuntimeError(f"Curl command failed: {stderr.decode()}")
-                
-                response = stdout.decode()
-                status_code = int(response[-3:])
-                
-                if status_code != 200:
-                    raise RuntimeError(f"Server returned status code {status_code}")
-                    
-                self.logger.debug("PyLume server started successfully")
-            except Exception as e:
-                self.logger.debug(f"Server verification failed: {str(e)}")
-                if self.server_process:
-                    self.server_process.terminate()
-                    try:
-                        self.server_process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        self.server_process.kill()
-                self.output_file.close()
-                os.unlink(self.output_file.name)
-                raise RuntimeError(f"Server started but is not responding: {str(e)}")
-            
-            self.logger.debug("Server startup completed successfully")
-            
-        except Exception as e:
-            raise RuntimeError(f"Failed to start lume server: {str(e)}")
-
     async def _start_server(self) -> None:
         """Start the lume server using the lume executable."""
         self.logger.debug("Starting PyLume server")
         
-        # Get absolute path to lume executable in the same directory as this file
-        lume_path = os.path.join(os.path.dirname(__file__), "lume")
-        if not os.path.exists(lume_path):
-            raise RuntimeError(f"Could not find lume binary at {lume_path}")
-
+        lume_path = self._lume_path
         try:
-            # Make executable
-            os.chmod(lume_path, 0o755)
-            
             # Get and validate port
-            self.port = self._get_server_port()
-            self.base_url = f"http://localhost:{self.port}/lume"
+            self._set_port(await self._get_server_port())
 
-            # Set up output handling
-            self.output_file = tempfile.NamedTemporaryFile(mode='w+', delete=False)
-            
             # Start the server process with the lume executable
-            env = os.environ.copy()
-            env["RUST_BACKTRACE"] = "1"  # Enable backtrace for better error reporting
+            env = {**os.environ, "RUST_BACKTRACE": "1"}  # Enable backtrace for better error reporting
             
-            self.server_process = subprocess.Popen(
-                [lume_path, "serve", "--port", str(self.port)],
-                stdout=self.output_file,
-                stderr=subprocess.STDOUT,
+            self.server_process = await asyncio.create_subprocess_exec(
+                lume_path, "serve", "--port", str(self.port),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
                 cwd=os.path.dirname(lume_path),  # Run from same directory as executable
-                env=env
+                env=env,
+                # Own process group, so cleanup also reaches anything lume spawns
+                start_new_session=True
             )
 
-            # Wait for server to initialize
-            await asyncio.sleep(2)
+            # Collect server output as it arrives and watch for the startup message
+            self.server_output = deque(maxlen=_OUTPUT_LINES)
+            self._server_started = asyncio.Event()
+            self._output_task = asyncio.create_task(self._tail_log())
+
             await self._wait_for_server()
 
         except Exception as e:
@@ -297,59 +168,89 @@ class LumeServer:
             raise RuntimeError(f"Failed to start lume server process: {str(e)}")
 
     async def _tail_log(self) -> None:
-        """Read and display server log output in debug mode."""
-        while True:
-            try:
-                self.output_file.seek(0, os.SEEK_END)
-                line = self.output_file.readline()
-                if line:
-                    line = line.strip()
-                    if line:
-                        print(f"SERVER: {line}")
-                if self.server_process.poll() is not None:
-                    print("Server process ended")
-                    break
-                await asyncio.sleep(0.1)
-            except Exception as e:
-                print(f"Error reading log: {e}")
-                await asyncio.sleep(0.1)
+        """Read server output as it is written, displaying it in debug mode."""
+        try:
+            async for raw in self.server_process.stdout:
+                if raw.isspace():
+                    continue
+                # Lines are kept as bytes and only decoded when displayed
+                self.server_output.append(raw)
+                if self.debug:
+                    self.logger.debug("SERVER: %s", raw.decode(errors="replace").strip())
+                if _READY_MARKER in raw:
+                    self._server_started.set()
+        except Exception as e:
+            self.logger.debug(f"Error reading log: {e}")
 
     async def _wait_for_server(self) -> None:
-        """Wait for server to start and become responsive with increased timeout."""
-        start_time = time.time()
-        while time.time() - start_time < self.server_start_timeout:
-            if self.server_process.poll() is not None:
-                error_msg = await self._get_error_output()
-                await self._cleanup()
-                raise RuntimeError(error_msg)
-            
-            try:
-                await self._verify_server()
-                self.logger.debug("Server is now responsive")
-                return
-            except Exception as e:
-                self.logger.debug(f"Server not ready yet: {str(e)}")
-                await asyncio.sleep(1.0)
+        """Wait for server to start and become responsive with increased timeout.
+
+        Wakes up as soon as the server reports it has started, accepts connections
+        on its port, or the process exits, falling back to probes with exponential
+        backoff otherwise.
+        """
+        process = self.server_process
+        exited = asyncio.ensure_future(process.wait())
+        started = asyncio.ensure_future(self._server_started.wait())
+        listening = asyncio.ensure_future(self._wait_for_port())
+        delay = _PROBE_BACKOFF_START
+        try:
+            deadline = time.time() + self.server_start_timeout
+            while time.time() < deadline:
+                waiters = {exited} | {w for w in (started, listening) if not w.done()}
+                # Never sleep past the startup deadline
+                timeout = min(delay, deadline - time.time())
+                await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                # wait() can stay pending while a child of lume still holds the output
+                # pipe, so the exit status is checked directly as well
+                if exited.done() or process.returncode is not None:
+                    # Let the reader drain any remaining output before reporting it
+                    await asyncio.wait({self._output_task}, timeout=_OUTPUT_DRAIN_TIMEOUT)
+                    error_msg = await self._get_error_output()
+                    await self._cleanup()
+                    raise RuntimeError(error_msg)
+                
+                try:
+                    await self._verify_server()
+                    self.logger.debug("Server is now responsive")
+                    return
+                except Exception as e:
+                    self.logger.debug(f"Server not ready yet: {str(e)}")
+                    delay = min(delay * 2, _PROBE_BACKOFF_MAX)
+        finally:
+            exited.cancel()
+            started.cancel()
+            listening.cancel()
         
         await self._cleanup()
         raise RuntimeError(f"Server failed to start after {self.server_start_timeout} seconds")
 
+    async def _wait_for_port(self) -> None:
+        """Return once the server's port accepts TCP connections."""
+        while True:
+            try:
+                _, writer = await asyncio.open_connection("localhost", self.port)
+            except OSError:
+                await asyncio.sleep(_PORT_RETRY_INTERVAL)
+                continue
+            writer.close()
+            return
+
+    async def _probe_status(self) -> int:
+        """Send the health probe request and return the response's status code."""
+        reader, writer = await asyncio.open_connection("localhost", self.port)
+        try:
+            writer.write(self._probe_request)
+            # Only the status line is needed, e.g. b"HTTP/1.1 200 OK\r\n"
+            status_line = await reader.readline()
+        finally:
+            writer.close()
+        return int(status_line.split(None, 2)[1])
+
     async def _verify_server(self) -> None:
         """Verify server is responding to requests."""
         try:
-            cmd = ["curl", "-s", "-w", "%{http_code}", "-m", "10", f"{self.base_url}/vms"]
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                raise RuntimeError(f"Curl command failed: {stderr.decode()}")
-            
-            response = stdout.decode()
-            status_code = int(response[-3:])
+            status_code = await asyncio.wait_for(self._probe_status(), timeout=_VERIFY_TIMEOUT)
             
             if status_code != 200:
                 raise RuntimeError(f"Server returned status code {status_code}")
@@ -360,41 +261,77 @@ class LumeServer:
 
     async def _get_error_output(self) -> str:
         """Get error output from the server process."""
-        if not self.output_file:
+        if not self.server_output:
             return "No output available"
-        self.output_file.seek(0)
-        output = self.output_file.read()
+        output = b"".join(self.server_output).decode(errors="replace").strip()
         return (
             f"Server process terminated unexpectedly.\n"
             f"Exit code: {self.server_process.returncode}\n"
             f"Output: {output}"
         )
 
+    def _signal_group(self, sig: int) -> None:
+        """Send a signal to the server's process group."""
+        try:
+            # The server leads its own session, so its pid is the group id
+            os.killpg(self.server_process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _group_alive(self) -> bool:
+        """Whether the server's process group still has members we may signal."""
+        try:
+            os.killpg(self.server_process.pid, 0)
+        except (ProcessLookupError, PermissionError):
+            return False
+        return True
+
     async def _cleanup(self) -> None:
-        """Clean up all server resources."""
-        if self.server_process:
+        """Clean up all server resources.
+
+        The process group is only signalled while it is known to exist: while lume is
+        unreaped its pid can't be reused, and afterwards the group is checked for
+        members first, since the id of an empty group may be recycled.
+        """
+        process = self.server_process
+        if process:
             try:
-                self.server_process.terminate()
-                try:
-                    self.server_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    self.server_process.kill()
+                if process.returncode is None:
+                    self._signal_group(signal.SIGTERM)
+                    try:
+                        await asyncio.wait_for(process.wait(), timeout=_STOP_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        if process.returncode is None or self._group_alive():
+                            self._signal_group(signal.SIGKILL)
+                        # Reap the killed process so it doesn't linger as a zombie
+                        await asyncio.wait_for(process.wait(), timeout=_STOP_TIMEOUT)
+                # Stop anything lume left behind, e.g. children of a crashed server
+                if self._group_alive():
+                    self._signal_group(signal.SIGKILL)
             except:
                 pass
             self.server_process = None
 
-        # Clean up output file
-        if self.output_file:
-            try:
-                self.output_file.close()
-                os.unlink(self.output_file.name)
-            except Exception as e:
-                self.logger.debug(f"Error cleaning up output file: {e}")
-            self.output_file = None
-
-    async def ensure_running(self) -> None:
-        """Start the server if we're managing it."""
-        if not self.use_existing_server:
+        # Stop reading server output
+        if self._output_task:
+            self._output_task.cancel()
+            self._output_task = None
+
+    async def ensure_running(self, verify: bool = False) -> None:
+        """Start the server if we're managing it, otherwise point at the existing one.
+
+        A managed server whose process is still alive is not started again, and is only
+        probed for responsiveness when verify is True.
+        """
+        if self.use_existing_server:
+            if self.base_url is None:
+                self._set_port(self.requested_port)
+        elif self.server_process is not None and self.server_process.returncode is None:
+            if verify:
+                await self._verify_server()
+        else:
+            # Release whatever a previous, exited server left: its group and output reader
+            await self._cleanup()
             await self._start_server()
 
     async def stop(self) -> None: